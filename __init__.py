@@ -1,11 +1,146 @@
 """Package to run bad apple using bsm module in bombsquad."""
 
+from queue import Queue, Empty, Full
+from threading import Thread, Event
+
 from babase import Plugin
 
 import bascenev1 as bs
 import bsm
 
 
+class _ThreadedLoader:
+    """
+    Streams the frames of a loaded PackedVideo onto a Screen.
+
+    Work is split in three stages joined by bounded queues, so a slow
+    stage only stalls once its queue runs dry instead of every frame:
+      - a reader thread pulls packed frames out of the video,
+      - a render thread turns them into pixel updates,
+      - a timer on the game thread (the only one allowed to touch nodes)
+        applies the updates that are due, every 1/fps seconds.
+    Most frames are sent as a delta: only the pixels that changed since
+    the previous frame, and frames flagged identical to the previous one
+    in the pack skip all render work. Every KEYFRAME_EVERY frames a full
+    frame is sent instead, so the screen resyncs even if an update went
+    missing.
+    Full frames are expanded into a fixed ring of reusable buffers, one
+    more than can be queued or on screen at once, holding one byte (0/1)
+    per pixel that is only turned into colors while drawing.
+    Frame deadlines are measured from the start of playback, so timer
+    jitter never accumulates into drift; late frames are dropped.
+    """
+
+    KEYFRAME_EVERY = 60
+
+    def __init__(self, screen, video, fps=30, prefetch=60):
+        self.screen = screen
+        self.frames = video.data
+        self.fps = fps
+        self.read_q = Queue(maxsize=prefetch)
+        self.draw_q = Queue(maxsize=prefetch)
+        self._stop = Event()
+        # queued frames + the one on screen + the one being rendered
+        n_px = self.frames.width * self.frames.height
+        self._bufs = [bytearray(n_px) for _ in range(prefetch + 2)]
+        self._buf_idx = 0
+        self._t0 = None
+        self._shown = 0
+
+        for target in (self._read, self._render):
+            Thread(target=target, daemon=True).start()
+        self._timer = bs.Timer(1.0 / fps, self._tick, repeat=True)
+
+    def _put(self, q, item):
+        # block on a full queue, but give up once playback is stopped
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except Full:
+                pass
+        return False
+
+    def _read(self):
+        for i in range(len(self.frames)):
+            if not self._put(self.read_q, self.frames.packed(i)):
+                return
+        self._put(self.read_q, None)
+
+    def _render(self):
+        same = self.frames.same
+        prev = None
+        i = 0
+        while True:
+            bits = self.read_q.get()
+            if bits is None:
+                self._put(self.draw_q, None)
+                return
+            if prev is None or i % self.KEYFRAME_EVERY == 0:
+                buf = self.frames.cells_into(bits, self._bufs[self._buf_idx])
+                self._buf_idx = (self._buf_idx + 1) % len(self._bufs)
+                item = (True, buf)
+            elif same[i]:
+                item = (False, {})
+            else:
+                item = (False, self.frames.changes(prev, bits))
+            prev = bits
+            i += 1
+            if not self._put(self.draw_q, item):
+                return
+
+    def _tick(self):
+        # frames are due against the start time, not the previous tick,
+        # so late ticks do not add up; if we are behind, skip frames
+        now = bs.time()
+        if self._t0 is None:
+            if self.draw_q.empty():
+                # first frame not rendered yet; start the clock once it is
+                return
+            self._t0 = now
+        # round, so a tick landing a hair early still counts as on time
+        due = int((now - self._t0) * self.fps + 0.5) + 1
+        full = None
+        changes = {}
+        done = False
+        while self._shown < due:
+            try:
+                item = self.draw_q.get_nowait()
+            except Empty:
+                # renderer fell behind; keep the current frame up a bit longer
+                break
+            if item is None:
+                done = True
+                break
+            is_key, data = item
+            if is_key:
+                full = data
+                changes.clear()
+            else:
+                # merge skipped deltas so each pixel is written once
+                changes.update(data)
+            self._shown += 1
+        ok = True
+        if full is not None:
+            if changes:
+                # fold the deltas that follow into the keyframe, so no
+                # pixel is sent to the engine twice in one tick
+                for idx, color in changes.items():
+                    full[idx] = bsm.BIT_COLORS.index(color)
+                changes = None
+            ok = self.screen.push_frame(map(bsm.BIT_COLORS.__getitem__, full))
+        if ok and changes:
+            ok = self.screen.patch(changes)
+        if done or not ok:
+            self.stop()
+
+    def stop(self):
+        """Stop playback and let the worker threads exit."""
+        self._stop.set()
+        # dropping the last reference cancels the timer
+        self._timer = None
+
+
 # brobord collide grass
 # ba_meta require api 9
 # ba_meta export plugin
@@ -14,10 +149,18 @@ class BadApple(Plugin):
     def play(self):
         """
         Play the bad-apple video in the current activity.
-        NOTE: It will take some time to load the video frames.
+        NOTE: The first run packs the video frames into a single file,
+        which takes some time. Later runs load that file directly.
         """
         # dont change resolution, frames are 50x50 by default
         # this position looks good on football and hockey map.
         screen = bsm.Screen(position=(-3.5, 1, 3.2), resolution=(50, 50), char="@")
-        video = bsm.Video(folder_name="BSM/bad_apple_ppm_frames", resolution=(50, 50))
-        bs.timer(5, bs.Call(screen.load, video, 30))
+        video = bsm.PackedVideo(folder_name="BSM/bad_apple_ppm_frames", resolution=(50, 50))
+        # start as soon as the frames are loaded, not after a fixed delay
+        video.set_on_data_ready_callback(bs.Call(self._start, screen))
+
+    def _start(self, screen, video):
+        if video.error:
+            print(f"BadApple Error: Could not load video frames: {video.error}")
+            return
+        self._loader = _ThreadedLoader(screen, video, fps=30)
@@ -17,20 +17,53 @@ Classes:
     Image: Handles concurrent loading of a single PPM image.
     Video: Handles concurrent loading and playback of a video sequence
            from a folder containing PPM frames and a stamps.json file.
+    PackedVideo: Plays a black & white video from a single bit-packed
+                 frame file, built once from a regular Video folder.
+                 BIT_COLORS holds the colors used for its pixels.
     Screen: Manages a grid of Pixel nodes and loads/displays Image or Video media.
     byBordd: The main BombSquad Plugin class.
 
 Functions:
     calc: Parses PPM image data and resizes it to a target resolution.
+    calc_batch: Decodes many PPM frames to one size into a single buffer.
+    colors: Turns calc's flat r, g, b bytes into (r, g, b) colors.
+    convert_ppm_folder: Packs a Video folder into a single bit-packed file.
+    pack_folder: Packs a Video folder's color frames into a single file.
+    clear_media_cache: Forgets cached Image/Video data so files are read again.
     ROOT: Returns the base directory for BSMedia files (user mods/BSM).
 """
 
-from os import makedirs
+import os
+import re
+from os import makedirs, replace, scandir
 from os.path import join, isabs, exists
-from json import load, JSONDecodeError
-from math import floor
+from json import JSONDecodeError
+try:
+    # optional; parses long stamps.json files several times faster
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+from zlib import compress, decompress
+from mmap import mmap, ACCESS_READ
+try:
+    # only where the OS supports the hint (not on Windows)
+    from mmap import MADV_SEQUENTIAL
+except ImportError:
+    MADV_SEQUENTIAL = None
+from struct import Struct
+from array import array
+from collections import deque, OrderedDict, defaultdict
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import chain, repeat, count, compress as pick
+from operator import ne, or_, itemgetter
+from functools import lru_cache
+from hashlib import blake2b
+from weakref import ref
+from bisect import bisect_right
+from statistics import median
 from bascenev1 import (
-    timer as tick,
+    Timer,
+    time as now,
     newnode,
     Call,
     getactivity,
@@ -39,13 +72,87 @@ from bascenev1 import (
 from babase import (
     Plugin,
     env,
-    pushcall
+    pushcall,
+    NodeNotFoundError
 )
-from threading import Thread
-from time import time
+from threading import Thread, Lock
+from concurrent.futures import ThreadPoolExecutor
 from traceback import print_exc
+from logging import getLogger
+
+@lru_cache(maxsize=None)
+def ROOT() -> str:
+    """Returns the base directory for BSMedia files (user mods/BSM)."""
+    # the user directory never changes while the game runs, so this is
+    # worked out on the first call only
+    return join(env()['python_directory_user'], 'BSM')
+
+# Packed video file: header, one float64 timestamp per frame, one
+# byte per frame set to 1 when it is identical to the frame before,
+# then every frame as rows of bits (1 = lit pixel), zlib-compressed
+# as one block. Each row starts on a byte boundary so rows can be
+# unpacked on their own.
+_PACK_MAGIC = b'BSMPACK4'
+_PACK_HEAD = Struct('<8sIHH')
+
+# Color frame pack (see pack_folder): the same header and timestamps,
+# then every frame as raw r, g, b bytes, uncompressed so frames can be
+# sliced straight out of a memory-mapped file.
+_RGB_MAGIC = b'BSMRGB01'
+_RGB_PACK_NAME = 'video.bsmpak'
+
+# Threads reading frame files at once when packing a video.
+_READ_WORKERS = 4
+
+# Shared workers decoding Image and Video frames. Threads are only
+# started on first use and are reused for every frame after that.
+_DECODE_POOL = ThreadPoolExecutor(
+    max_workers=max(2, os.cpu_count() or 4),
+    thread_name_prefix='bsm-decode'
+)
+
+# Recently loaded media data, so loading the same file at the same size
+# again is instant. Keyed by (kind, path, resolution); the least recently
+# used entries are dropped past _CACHE_SIZE.
+_CACHE_SIZE = 8
+_media_cache = OrderedDict()
+_cache_lock = Lock()
+
+# Decode problems go through logging rather than print: a stream of bad
+# frames then costs a level check each, not formatting plus a console write.
+_log = getLogger(__name__)
+
+# P6 header: magic, width, height and max value separated by whitespace
+# or '#' comments, then exactly one whitespace byte before the pixels.
+_PPM_SEP = rb'(?:\s|#[^\n]*\n)+'
+_PPM_HEAD = re.compile(rb'P6' + _PPM_SEP + rb'(\d+)' + _PPM_SEP + rb'(\d+)' + _PPM_SEP + rb'(\d+)\s')
+# (header bytes, width, height, max value) of the last PPM parsed. All
+# frames of a video normally share one header, so comparing against it
+# skips the regex for all but the first.
+_last_ppm_head = [None]
+
+# Colors of unlit (0) and lit (1) pixels of a packed video.
+BIT_COLORS = ((0.0, 0.0, 0.0), (1.0, 1.0, 1.0))
+
+# The 8 pixels stored in each possible packed byte (MSB first), as colors
+# and as 0/1 bytes, so unpacking is one table lookup per 8 pixels.
+_BYTE_COLORS = tuple(
+    tuple(BIT_COLORS[(b >> (7 - k)) & 1] for k in range(8)) for b in range(256)
+)
+_BYTE_CELLS = tuple(bytes((b >> (7 - k)) & 1 for k in range(8)) for b in range(256))
+
+# Color channel value (0-255) of each byte, for frames stored as bytes.
+_BYTE_TO_FLOAT = tuple(i / 255 for i in range(256))
 
-ROOT = lambda: join(env()['python_directory_user'], 'BSM')
+# Runs an iterator to exhaustion without storing anything.
+_drain = deque(maxlen=0).extend
+
+# Hidden pixels of deleted Screens, kept for reuse by the next Screen in
+# the same activity instead of deleting and recreating every node.
+# Keyed by (activity id, scale, char); nodes die with their activity.
+_PIXEL_POOL: dict[tuple, list] = defaultdict(list)
+_PIXEL_POOL_MAX = 10000
+_HIDDEN_POS = (-9999.0, -9999.0, -9999.0)
 
 try:
     makedirs(ROOT(), exist_ok=True)
@@ -60,6 +167,10 @@ class Pixel:
         display a colored character, forming part of the overall image
         or video frame on a Screen.
 
+        Deleted pixels are hidden and pooled rather than destroyed, and
+        Pixel.take reuses them, so recreating a Screen does not recreate
+        every node.
+
         Attributes:
             node: The bascenev1.Node of type 'text' representing the pixel.
                   None if node creation failed.
@@ -81,6 +192,8 @@ class Pixel:
             dsp: The character string to display for the pixel (e.g., '\u25A0').
         """
         s.node = None
+        act = getactivity(doraise=False)
+        s._pool_key = (id(act), scale, dsp)
         try:
             s.node = newnode(
                 'text',
@@ -105,10 +218,111 @@ class Pixel:
         Args:
             c: The (r, g, b) color tuple to set.
         """
-        if s.node and s.node.exists():
-            s.node.color = c
+        node = s.node
+        if node is None:
+            return
+        # just try: asking exists() first costs an engine call every time
+        try:
+            node.color = c
+        except NodeNotFoundError:
+            # the node was deleted, e.g. along with its activity
+            s.node = None
+
+    @classmethod
+    def take(
+        cls,
+        pos: tuple[float, float, float],
+        color: tuple[float, float, float],
+        scale: float,
+        dsp: str
+    ) -> 'Pixel':
+        """
+        Returns a pooled pixel moved to pos, or a new one if none is free.
+
+        Takes the same arguments as Pixel().
+        """
+        return cls.take_many((pos,), color, scale, dsp)[0]
+
+    @classmethod
+    def take_many(
+        cls,
+        positions: Iterable[tuple[float, float, float]],
+        color: tuple[float, float, float],
+        scale: float,
+        dsp: str
+    ) -> list['Pixel']:
+        """
+        Returns one pixel per position, like calling take() for each.
+
+        Pooled pixels are used up first. The rest are created with one
+        shared attrs dict that only has its position changed per node,
+        rather than a fresh Pixel() and attrs dict each.
+
+        Args:
+            positions: The (x, y, z) position of each pixel.
+            color: The initial (r, g, b) color of every pixel.
+            scale: The scale of the pixel nodes.
+            dsp: The character string to display for each pixel.
+
+        Returns:
+            The pixels, in the order of positions. A pixel whose node could
+            not be created has node set to None.
+        """
+        act = getactivity(doraise=False)
+        key = (id(act), scale, dsp)
+        pool = _PIXEL_POOL.get(key)
+        attrs = {
+            'text': dsp,
+            'position': None,
+            'in_world': True,
+            'color': color,
+            'shadow': 0.0,
+            'flatness': 1.0,
+            'scale': scale
+        }
+        pixels = []
+        new = cls.__new__
+        for pos in positions:
+            while pool:
+                p = pool.pop()
+                if p.node and p.node.exists():
+                    p.node.position = pos
+                    p.node.color = color
+                    break
+            else:
+                p = new(cls)
+                p._pool_key = key
+                attrs['position'] = pos
+                try:
+                    p.node = newnode('text', delegate=p, attrs=attrs)
+                except Exception as e:
+                    print(f"BSMPixel Error: Could not create node at {pos}: {e}")
+                    p.node = None
+            pixels.append(p)
+        return pixels
 
     def delete(s) -> None:
+        """
+        Removes the pixel from view and pools its node for reuse.
+
+        Once the pool is full the node is deleted instead.
+        """
+        if not (s.node and s.node.exists()):
+            s.node = None
+            return
+        pool = _PIXEL_POOL[s._pool_key]
+        if len(pool) >= _PIXEL_POOL_MAX:
+            s.destroy()
+            return
+        try:
+            s.node.color = (0, 0, 0)
+            s.node.position = _HIDDEN_POS
+        except Exception:
+            s.destroy()
+            return
+        pool.append(s)
+
+    def destroy(s) -> None:
         """
         Deletes the pixel node from the scene.
         """
@@ -147,7 +361,8 @@ class Image:
         Attributes:
             path: The path to the PPM file (relative to ROOT()).
             res: The target resolution (width, height) for resizing, or None.
-            data: The processed pixel data (list of color tuples) once complete.
+            data: The processed pixel data once complete, as flat r, g, b
+                  bytes (see calc's flat option), three per pixel.
                   None if processing failed or not yet complete.
             processing_complete: True if processing has finished (successfully or with error).
             error: An error message string if processing failed, otherwise None.
@@ -176,19 +391,22 @@ class Image:
         s.start_processing()
 
     def start_processing(s) -> None:
-        """Initiates background thread for image processing."""
+        """Queues image processing on the shared decode workers."""
         act = getactivity()
         if act is None or act.expired:
              print("BSMImage Warning: No active activity when starting processing.")
 
-        thread = Thread(target=s._perform_calc)
-        thread.daemon = True
-        thread.start()
+        cached = _cache_get(('image', s.path, s.res and tuple(s.res)))
+        if cached is not None:
+            s._on_calc_complete(cached)
+            return
+        _DECODE_POOL.submit(s._perform_calc)
 
     def _perform_calc(s) -> None:
         """Internal method run in a separate thread to call the calc function."""
         try:
-            pa = calc(s.path, s.res)
+            # flat bytes rather than a tuple of floats per pixel
+            pa = calc(s.path, s.res, flat=True)
             pushcall(lambda: s._on_calc_complete(pa), from_other_thread=True)
         except Exception as e:
             error_msg = f"Error processing image {s.path}: {e}"
@@ -200,6 +418,8 @@ class Image:
         s.data = pa
         s.error = err
         s.processing_complete = True
+        if pa is not None and err is None:
+            _cache_put(('image', s.path, s.res and tuple(s.res)), pa)
 
         if s.on_data_ready_callback:
             act = getactivity()
@@ -265,16 +485,30 @@ class Video:
         in background threads. Playback is managed by a timer in the
         main BombSquad thread.
 
+        If the folder holds a frame pack made by pack_folder at the same
+        resolution, frames are sliced out of that one file instead of
+        decoding a PPM each.
+
+        Only a window of frames ahead of playback is kept decoded: the
+        Screen releases each frame once shown and asks for the next ones,
+        so memory does not grow with the length of the video and playback
+        starts as soon as the first window is loaded. Videos no longer
+        than the window are kept whole.
+
         Attributes:
             folder_name: The name of the folder (relative to ROOT()) containing video files.
             res: The target resolution (width, height) for resizing frames, or None.
-            data: A dictionary {timestamp: pixel_array} storing loaded frame data.
+            data: A dictionary {timestamp: pixel_array} storing the decoded frames
+                  of the current window, each as flat r, g, b bytes (see calc's
+                  flat option), or None for frames that failed.
             timestamp_map: A dictionary {timestamp: filename} read from stamps.json.
+            timestamps: The timestamps of all frames, sorted.
+            window: How many frames to keep decoded ahead of playback.
             frames_to_process: Total number of frames to load.
-            processed_frames: Number of frames successfully processed so far.
+            processed_frames: Number of frames processed so far.
             error: An error message string if loading/processing failed, otherwise None.
-            processing_complete: True if all frames have finished processing.
-            on_data_ready_callback: A function to call when all frame data is loaded.
+            processing_complete: True once the first window of frames is loaded.
+            on_data_ready_callback: A function to call when playback can start.
             video_play_timer: The BombSquad timer used for playback.
             current_video_frame_index: The index of the currently displayed frame in the sorted timestamps.
             video_playback_speed: The multiplier for playback speed (1.0 is normal).
@@ -283,7 +517,8 @@ class Video:
     def __init__(
         s,
         folder_name: str,
-        resolution: tuple[int, int] = None
+        resolution: tuple[int, int] = None,
+        window: int = 120
     ) -> None:
         """
         Initializes a Video instance and starts background loading of frames.
@@ -293,11 +528,25 @@ class Video:
                          This folder must contain 'stamps.json' and the frame files.
             resolution: An optional tuple (width, height) to resize each frame to.
                         If None, the original PPM resolution is used.
+            window: How many frames to keep decoded ahead of playback.
+                    Defaults to 120.
         """
         s.folder_name = folder_name
         s.res = resolution
+        s.window = max(1, window)
         s.data = {}
         s.timestamp_map: dict[float | int, str] = {}
+        s.timestamps = []
+        s._queued = set()
+        s._pack = None
+        # recently decoded frames by a hash of their file, so repeated
+        # frames are decoded once and share one buffer
+        s._decoded = OrderedDict()
+        s._decoded_lock = Lock()
+        # frames finished by decode workers, waiting for the main thread
+        s._pending = []
+        s._pending_lock = Lock()
+        s._drain_scheduled = False
         s.frames_to_process = 0
         s.processed_frames = 0
         s.error = None
@@ -312,6 +561,25 @@ class Video:
         if act is None or act.expired:
              print("BSMVideo Warning: No active activity when starting processing.")
 
+        cached = _cache_get(s._cache_key())
+        # a cached video is fully decoded; only reuse it if this one's
+        # window would keep it whole too, as release() edits data in place
+        if cached is not None and len(cached[1]) <= s.window:
+            s.timestamp_map, s.timestamps, s.data = cached
+            s.frames_to_process = s.processed_frames = len(s.timestamps)
+            s._queued = set(s.timestamps)
+            s.processing_complete = True
+            s._on_processing_complete()
+            return
+
+        if s._open_pack():
+            s.prefetch(0)
+            s.processed_frames = len(s.data)
+            s.processing_complete = True
+            print(f"BSMVideo: Playing {s.frames_to_process} frames of '{s.folder_name}' from its frame pack.")
+            s._on_processing_complete()
+            return
+
         timestamp_map = s._read_timestamp_map_from_folder()
         if timestamp_map is None:
             s.error = f"Failed to read timestamps from folder '{s.folder_name}'"
@@ -321,6 +589,7 @@ class Video:
             return
 
         s.timestamp_map = timestamp_map
+        s.timestamps = sorted(timestamp_map)
         s.frames_to_process = len(s.timestamp_map)
 
         if s.frames_to_process == 0:
@@ -334,55 +603,130 @@ class Video:
         s.error = None
         s.processing_complete = False
 
-        for timestamp, filename in s.timestamp_map.items():
-            thread = Thread(target=s._process_frame, args=(timestamp, filename, s.res))
-            thread.daemon = True
-            thread.start()
+        s.prefetch(0)
 
-    def _read_timestamp_map_from_folder(s) -> dict[float | int, str] | None:
-        """Reads and returns the timestamp map from stamps.json in the folder."""
-        folder_full_path = join(ROOT(), s.folder_name)
-        json_path = join(folder_full_path, 'stamps.json')
-        try:
-            if not exists(json_path):
-                 print(f"BSMVideo Error: stamps.json not found in folder '{s.folder_name}'.")
-                 return None
-
-            with open(json_path, 'r') as f:
-                timestamp_map = load(f)
-                converted_map = {}
-                for key, value in timestamp_map.items():
-                     try:
-                         if '.' in key:
-                             converted_key = float(key)
-                         else:
-                             converted_key = int(key)
-                     except ValueError:
-                         converted_key = key
-                     converted_map[converted_key] = value
-                return converted_map
+    def prefetch(s, start: int, count: int = None) -> None:
+        """
+        Queues decoding of upcoming frames that are not loaded yet.
 
-        except FileNotFoundError:
-            print(f"BSMVideo Error: stamps.json not found at '{json_path}'.")
-            return None
-        except JSONDecodeError:
-            print(f"BSMVideo Error: Could not decode '{json_path}'. Is it valid JSON?")
-            return None
+        Args:
+            start: Index (in timestamp order) of the first frame wanted.
+            count: How many frames from start to have ready. Defaults to
+                   the video's window.
+        """
+        if count is None:
+            count = s.window
+        for timestamp in s.timestamps[start:start + count]:
+            if timestamp not in s._queued:
+                s._queued.add(timestamp)
+                if s._pack is not None:
+                    # already decoded: just copy the frame out of the pack
+                    at = s._pack_body + s._pack_index[timestamp] * s._frame_size
+                    s.data[timestamp] = s._pack[at:at + s._frame_size]
+                else:
+                    _DECODE_POOL.submit(s._process_frame, timestamp, s.timestamp_map[timestamp], s.res)
+
+    def release(s, timestamp) -> None:
+        """
+        Drops a shown frame; it is decoded again if asked for later.
+
+        Videos that fit in the window are kept whole instead, so short
+        looping clips are only decoded once.
+        """
+        if len(s.timestamps) > s.window:
+            s._queued.discard(timestamp)
+            s.data.pop(timestamp, None)
+
+    def _open_pack(s) -> bool:
+        """
+        Switches to the folder's frame pack, if it has one at this video's
+        resolution. Returns True if frames will be read from the pack.
+        """
+        path = join(ROOT(), s.folder_name, _RGB_PACK_NAME)
+        head = _read_pack_head(path, _RGB_MAGIC)
+        if head is None:
+            return False
+        n, w, h = head
+        if s.res and tuple(s.res) != (w, h):
+            print(f"BSMVideo: Frame pack of '{s.folder_name}' is {w}x{h}, not {s.res}; decoding frames instead.")
+            return False
+
+        body = _PACK_HEAD.size + n * 8
+        try:
+            with open(path, 'rb') as f:
+                pack = mmap(f.fileno(), 0, access=ACCESS_READ)
+            if len(pack) != body + n * w * h * 3:
+                raise ValueError("truncated pack file")
         except Exception as e:
-            print(f"BSMVideo Error reading '{json_path}': {e}")
-            return None
+            print(f"BSMVideo Error reading frame pack '{path}': {e}")
+            return False
+
+        stamps = array('d')
+        stamps.frombytes(pack[_PACK_HEAD.size:body])
+        s._pack = pack
+        s._pack_body = body
+        s._frame_size = w * h * 3
+        s._pack_index = {ts: i for i, ts in enumerate(stamps)}
+        # stored sorted by pack_folder
+        s.timestamps = list(stamps)
+        s.frames_to_process = n
+        return True
+
+    def _cache_key(s) -> tuple:
+        """Returns the key of this video's decoded frames in the media cache."""
+        return ('video', s.folder_name, s.res and tuple(s.res))
+
+    def _read_timestamp_map_from_folder(s) -> dict[float | int, str] | None:
+        """Reads and returns the timestamp map from stamps.json in the folder."""
+        return read_stamps(s.folder_name)
 
 
     def _process_frame(s, timestamp, filename, res) -> None:
         """Internal method run in a separate thread to load and process a single frame."""
         frame_relative_path = join(s.folder_name, filename)
         try:
-            pa = calc(frame_relative_path, res)
-            pushcall(lambda: s._on_frame_processed(timestamp, pa), from_other_thread=True)
+            with open(join(ROOT(), frame_relative_path), 'rb') as f:
+                raw = f.read()
+            key = blake2b(raw, digest_size=16).digest()
+            with s._decoded_lock:
+                pa = s._decoded.get(key)
+            if pa is None:
+                # flat r, g, b bytes: far smaller than a tuple per pixel
+                pa = calc(frame_relative_path, res, raw=raw, flat=True)
+                if pa is not None:
+                    with s._decoded_lock:
+                        pa = s._decoded.setdefault(key, pa)
+                        s._decoded.move_to_end(key)
+                        if len(s._decoded) > s.window:
+                            s._decoded.popitem(last=False)
+            s._finish_frame(timestamp, pa)
         except Exception as e:
             error_msg = f"Error frame '{frame_relative_path}' at {timestamp}: {e}"
-            print(f"BSMVideo Error: {error_msg}")
-            pushcall(lambda: s._on_frame_processed(timestamp, None, error_msg), from_other_thread=True)
+            _log.error("BSMVideo Error: %s", error_msg)
+            s._finish_frame(timestamp, None, error_msg)
+
+    def _finish_frame(s, t, pa, err = None) -> None:
+        """
+        Hands a processed frame over to the main thread.
+
+        Frames finished before the main thread gets to them ride along
+        on the same pushcall, so a burst of decodes costs the main thread
+        one callback rather than one per frame.
+        """
+        with s._pending_lock:
+            s._pending.append((t, pa, err))
+            if s._drain_scheduled:
+                return
+            s._drain_scheduled = True
+        pushcall(s._drain_pending, from_other_thread=True)
+
+    def _drain_pending(s) -> None:
+        """Callback executed in the main thread to take in finished frames."""
+        with s._pending_lock:
+            done, s._pending = s._pending, []
+            s._drain_scheduled = False
+        for t, pa, err in done:
+            s._on_frame_processed(t, pa, err)
 
 
     def _on_frame_processed(
@@ -397,14 +741,18 @@ class Video:
         if err:
             if s.error is None:
                 s.error = err
-            print(f"BSMVideo: Frame {t} failed: {err}")
+            # already logged as an error by the decode worker
+            _log.debug("BSMVideo: Frame %s failed: %s", t, err)
 
-        if pa is not None:
+        if t in s._queued:
+            # failed frames are kept as None so playback can report them
             s.data[t] = pa
+            if s.error is None and len(s.data) == s.frames_to_process <= s.window:
+                _cache_put(s._cache_key(), (s.timestamp_map, s.timestamps, s.data))
 
-        if s.processed_frames >= s.frames_to_process:
+        if not s.processing_complete and s.processed_frames >= min(s.window, s.frames_to_process):
             s.processing_complete = True
-            print(f"BSMVideo: All {s.frames_to_process} frames processed.")
+            print(f"BSMVideo: First {s.processed_frames} of {s.frames_to_process} frames processed.")
             s._on_processing_complete()
 
     def _on_processing_complete(s) -> None:
@@ -412,7 +760,7 @@ class Video:
         if s.error:
             print(f"BSMVideo: Video processing finished with errors: {s.error}")
         else:
-            print("BSMVideo: Video processing finished successfully.")
+            print("BSMVideo: Video ready to play.")
 
         if s.on_data_ready_callback:
             act = getactivity()
@@ -453,10 +801,232 @@ class Video:
         """Cleans up the Video instance."""
         print("BSMVideo: Delete called.")
         s.timestamp_map = {}
+        s.timestamps = []
+        s._queued = set()
+        s._pack = None
         s.data = {}
         s.on_data_ready_callback = None
 
 
+class PackedVideo(Video):
+    __doc__ = """
+        Plays a black & white video from a single bit-packed frame file.
+
+        A regular Video folder (PPM frames + stamps.json) is converted once
+        into a pack file stored inside that same folder (see
+        convert_ppm_folder). Every later load reads and decompresses that
+        one file instead of opening and parsing each PPM frame, and frames
+        are only unpacked into colors when the Screen asks for them.
+
+        Loading Example:
+            # Packs <User Dir>/BSM/my_video/ on first use
+            video = PackedVideo(folder_name='my_video', resolution=(50, 50))
+            my_screen.load(video, speed=30)
+
+        Attributes:
+            pack_name: The pack file name inside the video folder.
+            width: Frame width in pixels, read from the pack.
+            height: Frame height in pixels, read from the pack.
+            (Other attributes are inherited from Video.)
+    """
+    def __init__(
+        s,
+        folder_name: str,
+        resolution: tuple[int, int] = None,
+        pack_name: str = 'frames.bsmpack'
+    ) -> None:
+        """
+        Initializes a PackedVideo instance and starts loading its pack file.
+
+        Args:
+            folder_name: The name of the folder located inside ROOT()
+                         containing 'stamps.json' and the frame files.
+            resolution: An optional tuple (width, height) for the frames.
+                        The pack is rebuilt if it was made at another size.
+            pack_name: The pack file name inside the folder.
+        """
+        s.pack_name = pack_name
+        s.width = s.height = 0
+        super().__init__(folder_name, resolution)
+
+    def start_processing(s) -> None:
+        """Initiates background thread to build (if needed) and read the pack."""
+        act = getactivity()
+        if act is None or act.expired:
+             print("BSMVideo Warning: No active activity when starting processing.")
+
+        cached = _cache_get(s._cache_key())
+        if cached is not None:
+            s._on_pack_loaded(cached)
+            return
+        thread = Thread(target=s._load_pack)
+        thread.daemon = True
+        thread.start()
+
+    def _load_pack(s) -> None:
+        """Internal method run in a separate thread to read the pack file."""
+        pack_path = join(ROOT(), s.folder_name, s.pack_name)
+        try:
+            head = _read_pack_head(pack_path)
+            if head is None or (s.res and tuple(s.res) != head[1:]):
+                print(f"BSMVideo: Packing frames of '{s.folder_name}', this happens only once.")
+                if not convert_ppm_folder(s.folder_name, s.pack_name, s.res):
+                    raise ValueError("could not pack frames")
+                head = _read_pack_head(pack_path)
+                if head is None:
+                    raise ValueError("bad pack file")
+
+            n, w, h = head
+            with open(pack_path, 'rb') as f:
+                raw = f.read()
+            flags = _PACK_HEAD.size + n * 8
+            body = flags + n
+            stamps = array('d')
+            stamps.frombytes(raw[_PACK_HEAD.size:flags])
+            frames = _PackedFrames(decompress(raw[body:]), stamps, w, h, raw[flags:body])
+            if len(frames.buf) != n * frames.frame_size:
+                raise ValueError("truncated pack file")
+            pushcall(lambda: s._on_pack_loaded(frames), from_other_thread=True)
+        except Exception as e:
+            error_msg = f"Error loading pack '{pack_path}': {e}"
+            print(f"BSMVideo Error: {error_msg}")
+            pushcall(lambda: s._on_pack_loaded({}, error_msg), from_other_thread=True)
+
+    def _cache_key(s) -> tuple:
+        """Returns the key of this video's loaded pack in the media cache."""
+        return ('pack', s.folder_name, s.pack_name, s.res and tuple(s.res))
+
+    def prefetch(s, start: int, count: int = None) -> None:
+        """Does nothing: every packed frame is already in memory."""
+
+    def release(s, timestamp) -> None:
+        """Does nothing: packed frames are small enough to keep."""
+
+    def _on_pack_loaded(s, frames, err = None) -> None:
+        """Callback executed in the main thread when the pack is read."""
+        s.data = frames
+        s.error = err
+        if err is None:
+            s.width, s.height = frames.width, frames.height
+            s.timestamps = list(frames)
+            _cache_put(s._cache_key(), frames)
+        s.frames_to_process = s.processed_frames = len(frames)
+        s.processing_complete = True
+        s._on_processing_complete()
+
+
+class _PackedFrames(Mapping):
+    """Read-only {timestamp: pixel_array} view that unpacks frames on access."""
+    def __init__(s, buf, stamps, width, height, same) -> None:
+        s.buf = buf
+        s._view = memoryview(buf)
+        # same[i] is 1 when frame i is identical to frame i - 1
+        s.same = same
+        s.width = width
+        s.height = height
+        s.row_size = (width + 7) // 8
+        s.frame_size = s.row_size * height
+        s.index = {t: i for i, t in enumerate(stamps)}
+
+    def __getitem__(s, ts):
+        return s.unpack(s.packed(s.index[ts]))
+
+    def packed(s, i: int) -> memoryview:
+        """
+        Returns the packed bits of the i-th frame (in timestamp order).
+
+        The result is a read-only view into the decoded pack, so handing
+        frames to other threads copies nothing.
+        """
+        start = i * s.frame_size
+        return s._view[start:start + s.frame_size]
+
+    def unpack(s, bits) -> tuple:
+        """
+        Expands packed frame bits into a tuple of (r, g, b) colors.
+
+        Results are cached by frame content, so repeated frames (black
+        screens, still shots) are only expanded once.
+        """
+        return _unpack_frame(bytes(bits), s.width, s.row_size)
+
+    def cells_into(s, bits, out: bytearray) -> bytearray:
+        """
+        Expands packed frame bits into an existing buffer of 0/1 cells.
+
+        Lets callers reuse their own frame buffers instead of getting a
+        new object per frame, at one byte per pixel. Map cells to colors
+        with BIT_COLORS when drawing.
+
+        Args:
+            bits: The packed frame, as returned by packed().
+            out: A bytearray of width * height bytes to overwrite.
+
+        Returns:
+            The out buffer.
+        """
+        w, rs = s.width, s.row_size
+        cells = _BYTE_CELLS.__getitem__
+        y = 0
+        for i in range(0, len(bits), rs):
+            out[y:y + w] = b''.join(map(cells, bits[i:i + rs]))[:w]
+            y += w
+        return out
+
+    def changes(s, prev_bits, bits) -> dict:
+        """
+        Lists the pixels that differ between two packed frames.
+
+        The frames are XORed as one big integer, then only the set bits
+        are visited, so the cost follows the number of changed pixels
+        rather than the frame size.
+
+        Args:
+            prev_bits: The packed frame currently on screen.
+            bits: The packed frame to show next.
+
+        Returns:
+            A dictionary {pixel index: (r, g, b)} of the changed pixels.
+        """
+        new = int.from_bytes(bits, 'big')
+        diff = int.from_bytes(prev_bits, 'big') ^ new
+        off, on = BIT_COLORS
+        last = len(bits) * 8 - 1
+        stride = s.row_size * 8
+        w = s.width
+        out = {}
+        while diff:
+            low = diff & -diff
+            diff ^= low
+            y, x = divmod(last - (low.bit_length() - 1), stride)
+            out[y * w + x] = on if new & low else off
+        return out
+
+    def __iter__(s):
+        return iter(s.index)
+
+    def __len__(s) -> int:
+        return len(s.index)
+
+
+# a 50x50 frame is 2500 color references (~20 KB), so 64 frames ~1.3 MB
+@lru_cache(maxsize=64)
+def _unpack_frame(bits: bytes, width: int, row_size: int) -> tuple:
+    """Expands a packed frame, row by row, into a tuple of colors."""
+    frame = []
+    add = frame.extend
+    for i in range(0, len(bits), row_size):
+        add(_unpack_row(bits[i:i + row_size], width))
+    return tuple(frame)
+
+
+@lru_cache(maxsize=1024)
+def _unpack_row(row: bytes, width: int) -> tuple:
+    """Expands one packed row into a tuple of colors."""
+    colors = tuple(chain.from_iterable(map(_BYTE_COLORS.__getitem__, row)))
+    return colors[:width]
+
+
 class Screen:
     __doc__ = """
         Manages a grid of Pixel nodes and displays Image or Video media on them.
@@ -475,6 +1045,7 @@ class Screen:
             media: The currently loaded Image or Video instance.
             video_data: The pixel data for video frames (from the loaded Video instance).
             video_timestamps: Sorted list of timestamps for video frames.
+            video_delays: Seconds between each video frame and the next one.
             video_play_timer: The BombSquad timer controlling video frame updates.
             current_video_frame_index: The index of the currently displayed frame in the sorted timestamps.
             video_playback_speed: The current playback speed multiplier.
@@ -513,7 +1084,10 @@ class Screen:
         s.media = None
         s.video_data = None
         s.video_timestamps = None
+        s.video_delays = None
         s.video_play_timer = None
+        s._play_start = s._play_period = 0.0
+        s._shown_frame = None
         s.current_video_frame_index = 0
         s.video_playback_speed = 1.0
         s.video_loop = False
@@ -526,28 +1100,26 @@ class Screen:
             sp = sc * 13.5
 
 
+        _prune_pixel_pool()
         s.pixels = []
+        # the pixels' nodes, so frames can be written without going through Pixel
+        s._nodes = []
+        s._nodes_intact = True
         act = getactivity()
         if act and not act.expired:
              try:
+                # EDIT: making screen in x-z plane
+                # NOTE: pos-z is outside the plane.
+                # Positions run bottom-left to top-right, row by row.
+                xs = [px + j * sp for j in range(rx)]
+                positions = [(x, py, pz - i * sp) for i in range(rz) for x in xs]
                 with act.context:
-                    for i in range(rz):
-                        for j in range(rx):
-                            # Position pixels bottom-left to top-right
-
-                            # EDIT: making screen in x-z plane
-                            # NOTE: pos-z is outside the plane.
-                            p_pos = (px + j * sp, py, pz - i * sp)
-                            p = Pixel(
-                                pos=p_pos,
-                                color=(0,0,0),
-                                scale=sc,
-                                dsp=char
-                            )
-                            if p.node:
-                                s.pixels.append(p)
-                            else:
-                                print(f"BSMScreen Warning: Failed to create pixel node at {p_pos}")
+                    pixels = Pixel.take_many(positions, (0,0,0), sc, char)
+                for p_pos, p in zip(positions, pixels):
+                    if p.node:
+                        s.pixels.append(p)
+                    else:
+                        print(f"BSMScreen Warning: Failed to create pixel node at {p_pos}")
              except Exception as e:
                  print(f"BSMScreen Error creating pixel nodes: {e}")
                  print_exc()
@@ -556,6 +1128,13 @@ class Screen:
              print("BSMScreen Warning: No active activity when creating screen. Pixel nodes not created.")
 
 
+        s._nodes = [p.node for p in s.pixels]
+        # cleared once a node is found deleted; writes then skip dead nodes
+        s._nodes_intact = True
+        # the activity the nodes live in, looked up once rather than per
+        # frame; weak, so the screen does not keep a finished activity alive
+        s._activity = ref(act) if act is not None else None
+
         if media: s.load(media)
 
     def load(s, media: Image | Video, speed: float = 1.0, loop: bool = False) -> None:
@@ -573,6 +1152,7 @@ class Screen:
         s.media = media
         s.video_data = None
         s.video_timestamps = None
+        s.video_delays = None
         s._stop_video_playback()
 
         s.video_playback_speed = max(0.01, speed)
@@ -607,18 +1187,27 @@ class Screen:
         try:
             with act.context:
                 if isinstance(media, Image):
-                    if media.data and len(media.data) == len(s.pixels):
-                        for i, color in enumerate(media.data):
+                    data = media.data
+                    if isinstance(data, bytes):
+                        data = list(colors(data))
+                    if data and len(data) == len(s.pixels):
+                        for i, color in enumerate(data):
                             s.pixels[i].set(color)
                     elif media.data is None:
                          print("BSMScreen Error: Image data is None.")
                     else:
-                        print(f"BSMScreen Error: Image data size ({len(media.data)}) mismatch with pixel count ({len(s.pixels)}).")
+                        print(f"BSMScreen Error: Image data size ({len(data)}) mismatch with pixel count ({len(s.pixels)}).")
 
                 elif isinstance(media, Video):
                     s.video_data = media.data
                     if s.video_data:
-                        s.video_timestamps = sorted(s.video_data.keys())
+                        # the video's own sorted list: data only holds its
+                        # current window, and there is no need to sort again
+                        ts = s.video_timestamps = media.timestamps
+                        s.video_delays = [b - a for a, b in zip(ts, ts[1:])]
+                        if min(s.video_delays, default=0) < 0:
+                            print("BSMScreen Warning: Negative video frame delays, using 0.")
+                            s.video_delays = [max(0, d) for d in s.video_delays]
                         s.current_video_frame_index = 0
                         s._start_video_playback()
                     else:
@@ -633,73 +1222,177 @@ class Screen:
 
 
     def _start_video_playback(s) -> None:
-        """Starts the video playback timer."""
+        """
+        Starts the video playback timer.
+
+        A single repeating timer runs at the video's typical frame delay;
+        each tick shows whichever frame is due at that point, measured
+        from the start of playback. Frames that come due while another is
+        still showing are skipped, so slow ticks never make the video lag.
+        """
         s._stop_video_playback()
         if s.video_timestamps and s.pixels:
-            s._play_next_video_frame()
+            delay = median(s.video_delays) if s.video_delays else 0
+            s._play_period = max(0.01, delay / s.video_playback_speed)
+            s._play_start = now()
+            s._shown_frame = None
+            s.video_play_timer = Timer(s._play_period, Call(s._tick_video), repeat=True)
+            s._tick_video()
 
     def _stop_video_playback(s) -> None:
         """Stops the video playback timer."""
-        if s.video_play_timer:
-            s.video_play_timer.cancel()
-            s.video_play_timer = None
+        # dropping the last reference cancels the timer
+        s.video_play_timer = None
 
-    def _play_next_video_frame(s) -> None:
-        """Displays the next video frame and schedules the subsequent one."""
-        if not s.video_timestamps or not s.pixels:
-             print("BSMScreen Warning: Playback called with no data or pixels.")
-             s._stop_video_playback()
-             return
+    def push_frame(s, frame) -> bool:
+        """
+        Shows a single frame on the screen right away.
 
-        if s.current_video_frame_index < len(s.video_timestamps):
-            ts = s.video_timestamps[s.current_video_frame_index]
-            frame_data = s.video_data.get(ts)
-
-            if frame_data and len(frame_data) == len(s.pixels):
-                act = getactivity()
-                if act and not act.expired:
-                     try:
-                         with act.context:
-                            for i, color in enumerate(frame_data):
-                                s.pixels[i].set(color)
-                     except Exception as e:
-                         print(f"BSMScreen Error updating pixels for frame {ts}: {e}")
-                         print_exc()
-                         s._stop_video_playback()
-                         return
-                else:
-                    print(f"BSMScreen Error: Activity expired during video playback.")
-                    s._stop_video_playback()
-                    return
+        Used by video playback, and by callers that drive frames themselves
+        instead of loading a Video.
 
-                s.current_video_frame_index += 1
+        Args:
+            frame: An iterable of (r, g, b) colors, one per pixel, in the
+                   same order as calc's output.
 
-                if s.current_video_frame_index < len(s.video_timestamps):
-                    next_ts = s.video_timestamps[s.current_video_frame_index]
-                    delay = next_ts - ts
-                    if delay < 0:
-                         print(f"BSMScreen Warning: Negative video frame delay ({delay}), using 0.")
-                         delay = 0
+        Returns:
+            True if the pixels were updated, False otherwise.
+        """
+        act = s._activity() if s._activity else None
+        if act is None or act.expired:
+            print(f"BSMScreen Error: Activity expired during video playback.")
+            return False
 
-                    actual_delay = delay / s.video_playback_speed
-                    if actual_delay < 0: actual_delay = 0
+        try:
+            with act.context:
+                if s._nodes_intact:
+                    nodes = iter(s._nodes)
+                    frame = iter(frame)
+                    try:
+                        # map + a zero-length deque run the loop itself in C
+                        _drain(map(setattr, nodes, repeat('color'), frame))
+                        return True
+                    except NodeNotFoundError:
+                        # the write stopped at a deleted node; carry on
+                        # past it with the rest of the frame
+                        done = len(s._nodes) - nodes.__length_hint__()
+                        s._prune_nodes()
+                        _drain(map(Pixel.set, s.pixels[done:], frame))
+                        return True
+                _drain(map(Pixel.set, s.pixels, frame))
+        except Exception as e:
+            print(f"BSMScreen Error updating pixels: {e}")
+            print_exc()
+            return False
+        return True
 
-                    s.video_play_timer = tick(actual_delay, Call(s._play_next_video_frame))
-                else:
-                    print("BSMScreen: Video playback complete.")
-                    if s.video_loop:
-                        print("BSMScreen: Looping video.")
-                        s.current_video_frame_index = 0
-                        s._start_video_playback()
-                    else:
-                        s._stop_video_playback()
+    def patch(s, changes: dict) -> bool:
+        """
+        Recolors only some pixels of the screen right away.
+
+        Args:
+            changes: A dictionary {pixel index: (r, g, b)}, with indices
+                     in the same order as calc's output.
+
+        Returns:
+            True if the pixels were updated, False otherwise.
+        """
+        act = s._activity() if s._activity else None
+        if act is None or act.expired:
+            print(f"BSMScreen Error: Activity expired during video playback.")
+            return False
+
+        try:
+            with act.context:
+                if s._nodes_intact:
+                    nodes = map(s._nodes.__getitem__, changes.keys())
+                    try:
+                        _drain(map(setattr, nodes, repeat('color'), changes.values()))
+                        return True
+                    except NodeNotFoundError:
+                        # rewriting the pixels already done is harmless
+                        s._prune_nodes()
+                pixels = map(s.pixels.__getitem__, changes.keys())
+                _drain(map(Pixel.set, pixels, changes.values()))
+        except Exception as e:
+            print(f"BSMScreen Error updating pixels: {e}")
+            print_exc()
+            return False
+        return True
+
+    def _prune_nodes(s) -> None:
+        """Forgets deleted pixel nodes, so writes skip them from now on."""
+        for p in s.pixels:
+            if p.node is not None and not p.node.exists():
+                p.node = None
+        s._nodes = [p.node for p in s.pixels]
+        s._nodes_intact = False
+
+    def _tick_video(s) -> None:
+        """Shows the video frame due now, if it is not already showing."""
+        if not s.video_timestamps or not s.pixels:
+             print("BSMScreen Warning: Playback called with no data or pixels.")
+             s._stop_video_playback()
+             return
+
+        stamps = s.video_timestamps
+        idx = s.current_video_frame_index
+        # half a tick of slack, so a tick landing a hair early still
+        # counts as on time instead of skipping a frame on the next one
+        elapsed = (now() - s._play_start + s._play_period / 2) * s.video_playback_speed
+        due = bisect_right(stamps, stamps[0] + elapsed) - 1
+        if due < idx:
+            # the frame on screen is still current
+            return
 
+        ts = stamps[due]
+        if ts not in s.video_data:
+            # still decoding: hold the clock on this frame until it is
+            if ts not in s.media._queued:
+                # a late tick jumped past the prefetched window
+                s.media.prefetch(due)
+            s._play_start = now() - (ts - stamps[0]) / s.video_playback_speed
+            return
+        frame_data = shown = s.video_data[ts]
+        size = len(frame_data) if frame_data else 0
+        if isinstance(frame_data, bytes):
+            # Video frames are stored as flat r, g, b bytes
+            size //= 3
+            frame_data = colors(frame_data)
+
+        if not size or size != len(s.pixels):
+            print(f"BSMScreen Error: Frame data for timestamp {ts} invalid or size mismatch.")
+            s._stop_video_playback()
+            return
+        prev = s._shown_frame
+        # repeated frames share one object: nothing to redraw
+        if shown is not prev:
+            if isinstance(shown, bytes) and isinstance(prev, bytes) and len(shown) == len(prev):
+                # only recolor the pixels that differ from the frame on screen
+                ok = s.patch(_byte_frame_changes(prev, shown))
+            else:
+                ok = s.push_frame(frame_data)
+            if not ok:
+                s._stop_video_playback()
+                return
+        s._shown_frame = shown
+
+        # frames skipped on the way count as shown too
+        for skipped in stamps[idx:due + 1]:
+            s.media.release(skipped)
+        s.current_video_frame_index = due + 1
+        s.media.prefetch(due + 1)
+
+        if due + 1 == len(stamps):
+            print("BSMScreen: Video playback complete.")
+            if s.video_loop:
+                print("BSMScreen: Looping video.")
+                s.current_video_frame_index = 0
+                s.media.prefetch(0)
+                # start over once the last frame has had its turn
+                s._play_start = now() + s._play_period
             else:
-                print(f"BSMScreen Error: Frame data for timestamp {ts} invalid or size mismatch.")
                 s._stop_video_playback()
-        else:
-             print("BSMScreen Warning: _play_next_video_frame called with invalid index.")
-             s._stop_video_playback()
 
 
     def delete(s) -> None:
@@ -710,13 +1403,123 @@ class Screen:
             for pix in s.pixels:
                 if pix: pix.delete()
             s.pixels.clear()
+        s._nodes = []
         s.media = None
         s.video_data = None
         s.video_timestamps = None
+        s.video_delays = None
         s.video_play_timer = None
 
 
-def calc(p, t_res = None):
+def _prune_pixel_pool() -> None:
+    """Drops pooled pixels whose nodes died with their activity."""
+    for key, pool in list(_PIXEL_POOL.items()):
+        if not pool or not pool[-1].node or not pool[-1].node.exists():
+            del _PIXEL_POOL[key]
+
+
+def _byte_frame_changes(prev: bytes, frame: bytes) -> dict:
+    """
+    Lists the pixels that differ between two frames stored as r, g, b bytes.
+
+    Returns:
+        A dictionary {pixel index: (r, g, b)} of frame's changed pixels.
+    """
+    # a pixel changed if any of its three channels did; compared at C level
+    changed = map(
+        or_,
+        map(ne, prev[0::3], frame[0::3]),
+        map(or_, map(ne, prev[1::3], frame[1::3]), map(ne, prev[2::3], frame[2::3]))
+    )
+    to_float = _BYTE_TO_FLOAT
+    return {
+        i: (to_float[frame[i * 3]], to_float[frame[i * 3 + 1]], to_float[frame[i * 3 + 2]])
+        for i in pick(count(), changed)
+    }
+
+
+def _cache_get(key: tuple):
+    """Returns the cached media data for key, or None if not cached."""
+    with _cache_lock:
+        data = _media_cache.get(key)
+        if data is not None:
+            _media_cache.move_to_end(key)
+        return data
+
+
+def _cache_put(key: tuple, data) -> None:
+    """Caches media data under key, dropping the least recently used past the limit."""
+    with _cache_lock:
+        _media_cache[key] = data
+        _media_cache.move_to_end(key)
+        while len(_media_cache) > _CACHE_SIZE:
+            _media_cache.popitem(last=False)
+
+
+def clear_media_cache() -> None:
+    """
+    Forgets all cached media data.
+
+    Loaded images and videos are cached by path and resolution, so call
+    this after changing media files on disk to have them read again.
+    """
+    with _cache_lock:
+        _media_cache.clear()
+
+
+def read_stamps(folder_name: str) -> dict[float | int, str] | None:
+    """
+    Reads the timestamp map from stamps.json in a Video folder.
+
+    Args:
+        folder_name: The folder (relative to ROOT()) containing stamps.json.
+
+    Returns:
+        A dictionary {timestamp: filename} with numeric timestamp keys,
+        or None if the file is missing or invalid.
+    """
+    folder_full_path = join(ROOT(), folder_name)
+    json_path = join(folder_full_path, 'stamps.json')
+    try:
+        if not exists(json_path):
+             print(f"BSMVideo Error: stamps.json not found in folder '{folder_name}'.")
+             return None
+
+        with open(json_path, 'rb') as f:
+            timestamp_map = json_loads(f.read())
+        try:
+            return {
+                (float(key) if '.' in key else int(key)): value
+                for key, value in timestamp_map.items()
+            }
+        except ValueError:
+            pass
+
+        # some key is not a number: convert those that are, keep the rest
+        converted_map = {}
+        for key, value in timestamp_map.items():
+             try:
+                 if '.' in key:
+                     converted_key = float(key)
+                 else:
+                     converted_key = int(key)
+             except ValueError:
+                 converted_key = key
+             converted_map[converted_key] = value
+        return converted_map
+
+    except FileNotFoundError:
+        print(f"BSMVideo Error: stamps.json not found at '{json_path}'.")
+        return None
+    except JSONDecodeError:
+        print(f"BSMVideo Error: Could not decode '{json_path}'. Is it valid JSON?")
+        return None
+    except Exception as e:
+        print(f"BSMVideo Error reading '{json_path}': {e}")
+        return None
+
+
+def calc(p, t_res = None, raw = None, flat = False):
     """
     Loads and processes a PPM image file, optionally resizing it.
 
@@ -728,94 +1531,533 @@ def calc(p, t_res = None):
         p: The path to the PPM file (relative to ROOT()).
         t_res: An optional tuple (target_width, target_height) for resizing.
                If None, the original image resolution is used.
+        raw: Optional file contents already in memory (e.g. from
+             preload_frames). When given, p is only used in messages.
+             Otherwise the file is memory-mapped rather than read.
+        flat: Return the pixels as flat r, g, b bytes (0-255, rescaled if
+              the file's max value is not 255) instead of color tuples,
+              at a fraction of the memory; colors() turns them back.
 
     Returns:
         A list of (r, g, b) color tuples representing the pixel data,
         or None if loading or processing failed. The list is ordered
         row by row, from bottom-left to top-right, matching the
-        Screen's pixel layout.
+        Screen's pixel layout. With flat, one contiguous bytes object of
+        width * height * 3 values in the same order instead; pixel
+        (x, y) starts at offset (y * width + x) * 3.
     """
     p_full = join(ROOT(), p)
-    ow, oh = 0, 0
-
+    if raw is None:
+        # map the file instead of reading it: only the pages holding the
+        # rows that get sampled are ever loaded
+        try:
+            with open(p_full, 'rb') as f:
+                mm = mmap(f.fileno(), 0, access=ACCESS_READ)
+        except FileNotFoundError:
+            _log.error("BSMCalc Error: File not found %s", p_full)
+            return None
+        except Exception as e:
+            _log.error("BSMCalc Error reading %s: %s", p_full, e)
+            return None
+        if MADV_SEQUENTIAL is not None:
+            # rows are sampled top to bottom; let the OS read ahead
+            mm.madvise(MADV_SEQUENTIAL)
+        with mm:
+            return calc(p, t_res, memoryview(mm), flat)
+
+    if t_res is not None and (t_res[0] <= 0 or t_res[1] <= 0):
+        _log.error("BSMCalc Error: Bad target res %s", t_res)
+        return None
     try:
-        with open(p_full, 'rb') as f:
-            magic = f.readline().strip()
-            if magic != b'P6':
-                print(f"BSMCalc Error: Bad magic {magic}")
-                return None
-
-            mv = None
-            while ow == 0 or oh == 0 or mv is None:
-                line = f.readline().strip()
-                if not line or len(line) > 100:
-                     print("BSMCalc Error: Bad header.")
-                     return None
-                if line.startswith(b'#'): continue
-
-                parts = line.split()
-                if ow == 0 and len(parts) >= 2:
-                    try:
-                        ow, oh = int(parts[0].decode('ascii')), int(parts[1].decode('ascii'))
-                        if len(parts) >= 3:
-                            mv = int(parts[2].decode('ascii'))
-                    except ValueError:
-                        print("BSMCalc Error: Bad dims/max.")
-                        return None
-                elif mv is None and len(parts) >= 1:
-                     try:
-                         mv = int(parts[0].decode('ascii'))
-                     except ValueError:
-                         print("BSMCalc Error: Bad max val.")
-                         return None
-
-            if ow <= 0 or oh <= 0 or mv is None:
-                 print(f"BSMCalc Error: No dims/max {ow}x{oh} {mv}.")
-                 return None
-
-            if mv <= 0 or mv > 255:
-                 print(f"BSMCalc Warning: Max val {mv}, expected 255. Normalizing.")
-
-            exp_size = ow * oh * 3
-            r = f.read(exp_size)
-            if len(r) != exp_size:
-                print(f"BSMCalc Error: Bad data size. Exp {exp_size}, got {len(r)}.")
-                return None
+        frame = _decode_ppm(p, raw, t_res, flat)
+    except Exception as e:
+        _log.error("BSMCalc Error reading %s: %s", p_full, e)
+        return None
+    return frame[0] if frame is not None else None
 
-    except FileNotFoundError:
-        print(f"BSMCalc Error: File not found {p_full}")
+
+def calc_batch(
+    paths: list[str],
+    t_res: tuple[int, int] = None,
+    raws: list = None
+) -> memoryview | None:
+    """
+    Decodes many PPM frames to one size at once, like calc with flat=True.
+
+    The target size is checked and the sampling plan looked up once for
+    the whole batch instead of per frame, and the frames are written into
+    one buffer rather than one bytes object each.
+
+    Args:
+        paths: The paths of the PPM files (relative to ROOT()).
+        t_res: An optional tuple (target_width, target_height) for
+               resizing. If None, the first frame's resolution is used.
+        raws: Optional contents of the files already in memory (e.g.
+              from preload_frames), one per path. When given, paths are
+              only used in messages.
+
+    Returns:
+        A read-only memoryview of the frames' flat r, g, b bytes back to
+        back, in the order of paths (len(paths) * width * height * 3
+        bytes), or None if any frame failed. It views the buffer the
+        frames were written into, so nothing is copied on the way out;
+        slice it or pass it to bytes() to keep single frames.
+    """
+    if t_res is not None and (t_res[0] <= 0 or t_res[1] <= 0):
+        _log.error("BSMCalc Error: Bad target res %s", t_res)
         return None
-    except Exception as e:
-        print(f"BSMCalc Error reading {p_full}: {e}")
+    if raws is None:
+        raws = [None] * len(paths)
+
+    out = bytearray()
+    for p, raw in zip(paths, raws):
+        try:
+            if raw is None:
+                with open(join(ROOT(), p), 'rb') as f, mmap(f.fileno(), 0, access=ACCESS_READ) as mm:
+                    frame = _decode_ppm(p, memoryview(mm), t_res, True)
+            else:
+                frame = _decode_ppm(p, raw, t_res, True)
+        except Exception as e:
+            _log.error("BSMCalc Error reading %s: %s", p, e)
+            return None
+        if frame is None:
+            return None
+        px, t_res = frame
+        out += px
+    return memoryview(out).toreadonly()
+
+
+def _decode_ppm(p, raw, t_res: tuple[int, int] | None, flat: bool) -> tuple | None:
+    """
+    Decodes one in-memory PPM, as calc and calc_batch do.
+
+    Problems with the data are logged against p. t_res must already be
+    checked to be positive.
+
+    Returns:
+        (the pixels as calc returns them, the target resolution used,
+        which is the frame's own if t_res is None), or None if the data
+        is invalid.
+    """
+    head = _parse_ppm(raw)
+    if head is None:
+        _log.error("BSMCalc Error: Bad header in %s.", p)
+        return None
+    ow, oh, mv, r = head
+    if mv > 255:
+         _log.warning("BSMCalc Warning: Max val %d, expected 255. Normalizing.", mv)
+    exp_size = ow * oh * 3
+    r = r[:exp_size]
+    if len(r) != exp_size:
+        _log.error("BSMCalc Error: Bad data size in %s. Exp %d, got %d.", p, exp_size, len(r))
         return None
 
-    if t_res is None:
-        tw, th = ow, oh
+    tw, th = t_res if t_res is not None else (ow, oh)
+    px = _resample(r, ow, oh, tw, th)
+    if flat:
+        if mv != 255:
+            px = px.translate(_rescale_table(mv))
+        return px, (tw, th)
+
+    # look the floats up rather than dividing every byte by mv
+    it = map(_norm_table(mv).__getitem__, px)
+    # every three values in a row make up one color
+    return list(zip(it, it, it)), (tw, th)
+
+
+def colors(flat: bytes) -> Iterator[tuple[float, float, float]]:
+    """
+    Turns flat r, g, b bytes into (r, g, b) colors.
+
+    Keeping pixels as calc(..., flat=True) bytes takes 3 bytes per pixel
+    instead of a tuple and three floats; this gives the colors back only
+    when they are needed, e.g. to draw them.
+
+    Args:
+        flat: The bytes, as returned by calc with flat=True.
+
+    Returns:
+        An iterator over one color per pixel, in the same order. Channels
+        are the byte value / 255, sharing the float objects between
+        pixels rather than creating new ones.
+    """
+    it = map(_BYTE_TO_FLOAT.__getitem__, flat)
+    # every three values in a row make up one color
+    return zip(it, it, it)
+
+
+@lru_cache(maxsize=8)
+def _norm_table(mv: int) -> tuple[float, ...]:
+    """Returns value / mv for every byte value, as calc's colors use."""
+    if mv == 255:
+        return _BYTE_TO_FLOAT
+    return tuple(v / mv for v in range(256))
+
+
+@lru_cache(maxsize=8)
+def _rescale_table(mv: int) -> bytes:
+    """Returns a bytes.translate table scaling 0..mv to 0..255."""
+    return bytes(min(255, round(v * 255 / mv)) for v in range(256))
+
+
+def _resample(px, ow: int, oh: int, tw: int, th: int) -> bytes:
+    """
+    Nearest-neighbor resamples raw RGB bytes.
+
+    Only the source rows that are actually sampled get copied out of px,
+    so it can be a memoryview straight into a preloaded file; large
+    frames shrunk to a small screen never get copied whole.
+
+    Args:
+        px: The pixel bytes of a PPM, top row first (bytes or memoryview).
+        ow, oh: The source resolution.
+        tw, th: The target resolution.
+
+    Returns:
+        The sampled pixels as flat r, g, b bytes, bottom-left to top-right.
+    """
+    offsets, step, gather = _sample_plan(ow, oh, tw, th)
+
+    if gather is None and tw == ow:
+        # every column kept (e.g. no resize at all): whole rows are
+        # copied as they are, only their order is flipped
+        line = tw * 3
+        return b''.join([px[base:base + line] for base in offsets])
+
+    if gather is None:
+        # evenly spaced columns (any whole-number shrink factor): each
+        # channel of a row is one strided slice, copied without
+        # touching the bytes in Python at all
+        out = bytearray(tw * th * 3)
+        line = tw * 3
+        span = step * (tw - 1) + 1
+        for y, base in enumerate(offsets):
+            dst = y * line
+            for k in range(3):
+                out[dst + k:dst + line:3] = px[base + k:base + k + span:step]
+        return bytes(out)
+
+    stride = ow * 3
+    out = []
+    last = None
+    for base in offsets:
+        if base != last:
+            # rows repeat when enlarging; reuse the one just gathered
+            line = bytes(gather(bytes(px[base:base + stride])))
+            last = base
+        out.append(line)
+    return b''.join(out)
+
+
+def _sample_indices(size: int, target: int) -> list[int]:
+    """
+    Returns the source pixel nearest-neighbor sampling reads for each of
+    target output pixels, along an axis of size source pixels.
+
+    This is floor(i * size / target) in integer arithmetic, which is
+    exact; a float scale factor can land just below a whole number and
+    pick the pixel before. Always within 0..size - 1.
+    """
+    return [i * size // target for i in range(target)]
+
+
+@lru_cache(maxsize=16)
+def _sample_plan(ow: int, oh: int, tw: int, th: int) -> tuple:
+    """
+    Works out which source bytes _resample reads for one pair of sizes.
+
+    Every frame of a video shares its sizes, so this is done once rather
+    than per frame.
+
+    Returns:
+        (offsets, step, gather): the byte offset in the source of each
+        target row, bottom row first. For evenly spaced columns, step is
+        the byte distance between sampled pixels and gather is None, and
+        offsets point at the first sampled pixel. Otherwise offsets point
+        at the start of the row and gather is an itemgetter picking every
+        sampled byte out of it.
+    """
+    stride = ow * 3
+
+    # Nearest-neighbor sampling, worked out once per column and per row
+    # instead of once per pixel. Rows are flipped since the file starts
+    # with the top row.
+    xs = _sample_indices(ow, tw)
+    rows = [(oh - 1 - y) * stride for y in _sample_indices(oh, th)]
+
+    step = xs[1] - xs[0] if tw > 1 else 1
+    if step > 0 and xs == list(range(xs[0], xs[0] + step * tw, step)):
+        return tuple(r + xs[0] * 3 for r in rows), step * 3, None
+    # one itemgetter picks every sampled byte of a row in a single C call
+    return tuple(rows), None, itemgetter(*[x * 3 + k for x in xs for k in range(3)])
+
+
+def _read_pack_head(path: str, kind: bytes = _PACK_MAGIC) -> tuple[int, int, int] | None:
+    """Returns (frames, width, height) of a pack file, or None if unusable."""
+    try:
+        with open(path, 'rb') as f:
+            magic, n, w, h = _PACK_HEAD.unpack(f.read(_PACK_HEAD.size))
+    except Exception:
+        return None
+    if magic != kind:
+        return None
+    return n, w, h
+
+
+def pack_folder(folder_name: str, resolution: tuple[int, int] = None) -> bool:
+    """
+    Packs a Video folder's frames into a single file of color frames.
+
+    Every frame listed in stamps.json is decoded and resized once and
+    stored as raw r, g, b bytes in 'video.bsmpak' inside the folder, after
+    the sorted timestamps. A Video of that folder at the same resolution
+    then slices its frames out of this one file instead of opening and
+    decoding a PPM per frame. Run it again after changing the frames.
+
+    This is a one-time conversion; it runs on the calling thread.
+
+    Args:
+        folder_name: The Video folder (relative to ROOT()).
+        resolution: An optional tuple (width, height) to resize frames to.
+                    If None, the first frame's resolution is used.
+
+    Returns:
+        True if the pack was written, False otherwise.
+    """
+    stamps = read_stamps(folder_name)
+    if not stamps:
+        print(f"BSMPack Error: No frames to pack in '{folder_name}'.")
+        return False
+
+    ts_sorted = sorted(stamps)
+    raws = preload_frames(folder_name, [stamps[ts] for ts in ts_sorted])
+    if raws is None:
+        return False
+
+    if resolution:
+        w, h = resolution
     else:
-        tw, th = t_res
-        if tw <= 0 or th <= 0:
-            print(f"BSMCalc Error: Bad target res {t_res}")
-            return None
+        head = _parse_ppm(raws[0])
+        w, h = head[:2] if head else (1, 1)
+    names = [join(folder_name, stamps[ts]) for ts in ts_sorted]
+    frames = calc_batch(names, (w, h), raws)
+    if frames is None:
+        print(f"BSMPack Error: Could not decode the frames of '{folder_name}'.")
+        return False
+
+    out_path = join(ROOT(), folder_name, _RGB_PACK_NAME)
+    tmp_path = out_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_PACK_HEAD.pack(_RGB_MAGIC, len(ts_sorted), w, h))
+            f.write(array('d', ts_sorted).tobytes())
+            f.write(frames)
+        replace(tmp_path, out_path)
+    except Exception as e:
+        print(f"BSMPack Error writing '{out_path}': {e}")
+        return False
+
+    print(f"BSMPack: Packed {len(ts_sorted)} color frames ({w}x{h}) into '{out_path}'.")
+    return True
+
+
+def convert_ppm_folder(
+    folder_name: str,
+    out_name: str = 'frames.bsmpack',
+    resolution: tuple[int, int] = None
+) -> bool:
+    """
+    Packs a Video folder into a single bit-packed frame file.
+
+    Every frame listed in stamps.json is decoded straight to black & white
+    (a pixel is lit when its red value is over half the max value; frames
+    are expected to be grayscale) and stored as 1 bit per pixel, in calc's
+    pixel order and with calc's nearest-neighbor resizing. The pack is
+    written inside the same folder and is what PackedVideo plays.
+    Each row is packed on its own ((width + 7) // 8 bytes, first pixel in
+    the high bit), so a 50x50 frame takes 50 x 7 = 350 bytes, and all
+    frames are zlib-compressed together. Frames identical to the one
+    before are flagged so players can skip them outright.
+
+    This is a one-time conversion; it runs on the calling thread.
+
+    Args:
+        folder_name: The Video folder (relative to ROOT()).
+        out_name: The pack file name to write inside the folder.
+        resolution: An optional tuple (width, height) to resize frames to.
+                    If None, the first frame's resolution is used.
+
+    Returns:
+        True if the pack was written, False otherwise.
+    """
+    stamps = read_stamps(folder_name)
+    if not stamps:
+        print(f"BSMPack Error: No frames to pack in '{folder_name}'.")
+        return False
+
+    ts_sorted = sorted(stamps)
+    raws = preload_frames(folder_name, [stamps[ts] for ts in ts_sorted])
+    if raws is None:
+        return False
+
+    w, h = resolution if resolution else (0, 0)
+    timestamps = array('d', ts_sorted)
+    frames = bytearray()
+    same = bytearray(len(ts_sorted))
+    prev = None
+    for i, (ts, raw) in enumerate(zip(ts_sorted, raws)):
+        if not w:
+            head = _parse_ppm(raw)
+            w, h = head[:2] if head else (0, 0)
+        bits = _ppm_bits(raw, w, h)
+        if bits is None:
+            print(f"BSMPack Error: Could not decode '{join(folder_name, stamps[ts])}'.")
+            return False
+        same[i] = bits == prev
+        prev = bits
+        frames += bits
+
+    out_path = join(ROOT(), folder_name, out_name)
+    tmp_path = out_path + '.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(_PACK_HEAD.pack(_PACK_MAGIC, len(ts_sorted), w, h))
+            f.write(timestamps.tobytes())
+            f.write(same)
+            f.write(compress(frames, 9))
+        replace(tmp_path, out_path)
+    except Exception as e:
+        print(f"BSMPack Error writing '{out_path}': {e}")
+        return False
+
+    print(f"BSMPack: Packed {len(ts_sorted)} frames ({w}x{h}) into '{out_path}'.")
+    return True
+
+
+def _ppm_bits(raw, w: int, h: int) -> bytes | None:
+    """
+    Decodes in-memory P6 data straight into packed black & white rows.
+
+    Only the red byte of each pixel is looked at, and thresholding plus
+    bit packing run through bytes.translate and int(..., 2), so no
+    per-pixel Python objects are made.
+
+    Returns:
+        h rows of (w + 7) // 8 bytes, bottom row first, or None if the
+        data is not a valid P6 image.
+    """
+    head = _parse_ppm(raw)
+    if head is None or w <= 0 or h <= 0:
+        return None
+    ow, oh, mv, px = head
+    if len(px) < ow * oh * 3:
+        return None
 
-    pa = [None] * (tw * th)
-    xsf = ow / tw
-    ysf = oh / th
+    # '1' for lit red values, '0' for dark ones
+    table = bytes(0x31 if v * 2 > mv else 0x30 for v in range(256))
+    lit = bytes(px[0:ow * oh * 3:3]).translate(table)
+    xs = _sample_indices(ow, w)
+    rs = (w + 7) // 8
+    pad = b'0' * (rs * 8 - w)
+    out = bytearray()
+    for y in _sample_indices(oh, h):
+        oy = oh - 1 - y
+        row = lit[oy * ow:(oy + 1) * ow]
+        if w != ow:
+            row = bytes([row[x] for x in xs])
+        out += int(row + pad, 2).to_bytes(rs, 'big')
+    return bytes(out)
+
+
+def _parse_ppm(raw) -> tuple[int, int, int, memoryview] | None:
+    """
+    Splits in-memory P6 PPM data into its header values and pixel bytes.
 
-    for ty in range(th):
-        for tx in range(tw):
-            ox = min(ow - 1, floor(tx * xsf))
-            oy_raw = floor(ty * ysf)
-            oy = min(oh - 1, max(0, oh - 1 - oy_raw))
+    Returns:
+        (width, height, max value, pixel bytes view), or None if the
+        header is not a valid P6 header.
+    """
+    last = _last_ppm_head[0]
+    if last is not None:
+        head, ow, oh, mv = last
+        if raw[:len(head)] == head:
+            # same header as the previous file, e.g. the next video frame
+            return ow, oh, mv, memoryview(raw)[len(head):]
+
+    m = _PPM_HEAD.match(raw)
+    if m is None:
+        return None
+    ow, oh, mv = int(m[1]), int(m[2]), int(m[3])
+    # a max value of 0 is invalid too; checking it here keeps everything
+    # downstream from having to guard its divisions
+    if ow <= 0 or oh <= 0 or mv <= 0:
+        return None
+    _last_ppm_head[0] = (bytes(raw[:m.end()]), ow, oh, mv)
+    return ow, oh, mv, memoryview(raw)[m.end():]
 
-            pix_idx = (oy * ow + ox) * 3
-            r_b, g_b, b_b = r[pix_idx], r[pix_idx + 1], r[pix_idx + 2]
 
-            r_n = r_b / mv if mv > 0 else 0.0
-            g_n = g_b / mv if mv > 0 else 0.0
-            b_n = b_b / mv if mv > 0 else 0.0
+def preload_frames(folder_name: str, filenames: list[str]) -> list[memoryview] | None:
+    """
+    Reads many frame files of a folder into one contiguous buffer.
 
-            arr_idx = ty * th + tx
+    The folder is scanned once to learn every file size, a single buffer
+    is allocated for all of them, and each file is read straight into its
+    own slice of that buffer (one unbuffered read per file, no per-file
+    bytes objects). A few worker threads read files concurrently, since
+    file reads release the GIL, while a helper thread asks the OS to
+    prefetch the files ahead (where supported).
 
-            pa[arr_idx] = (r_n, g_n, b_n)
+    Args:
+        folder_name: The folder (relative to ROOT()) holding the files.
+        filenames: The file names to read, relative to the folder.
 
-    return pa
+    Returns:
+        A list of memoryviews (one per file, same order as filenames) into
+        the shared buffer, or None if any file could not be read.
+    """
+    folder_full_path = join(ROOT(), folder_name)
+    try:
+        with scandir(folder_full_path) as it:
+            sizes = {e.name: e.stat().st_size for e in it if e.is_file()}
+        buf = memoryview(bytearray(sum(sizes[fn] for fn in filenames)))
+        paths = [join(folder_full_path, fn) for fn in filenames]
+        if hasattr(os, 'posix_fadvise'):
+            Thread(target=_warm_files, args=(paths,), daemon=True).start()
+        views = []
+        pos = 0
+        for fn in filenames:
+            views.append(buf[pos:pos + sizes[fn]])
+            pos += sizes[fn]
+        with ThreadPoolExecutor(max_workers=_READ_WORKERS) as ex:
+            for _ in ex.map(_read_into, paths, views):
+                pass
+        return views
+    except KeyError as e:
+        print(f"BSMPack Error: Frame file {e} not found in '{folder_name}'.")
+    except Exception as e:
+        print(f"BSMPack Error reading frames of '{folder_name}': {e}")
+    return None
+
+
+def _read_into(path: str, view: memoryview) -> None:
+    """Fills view with the contents of the file at path."""
+    with open(path, 'rb', buffering=0) as f:
+        got = 0
+        while got < len(view):
+            n = f.readinto(view[got:])
+            if not n:
+                raise EOFError(f"'{path}' is shorter than expected")
+            got += n
+
+
+def _warm_files(paths: list[str]) -> None:
+    """Hints the OS to start reading files into the page cache (Linux/Android)."""
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass